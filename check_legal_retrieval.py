@@ -0,0 +1,82 @@
+"""Sanity check for the Legal AI Advisor retrieval index.
+
+Runs sample questions through retrieve_legal_passages() and checks that the
+expected provision is ranked first, or that nothing is injected for questions
+the bundled corpus does not cover. Run from the repository root:
+
+    python check_legal_retrieval.py
+"""
+import sys
+import time
+
+from docker import retrieve_legal_passages
+
+# (legal category, question, heading the top passage must start with; None means no passage)
+CASES = [
+    ("Property", "landlord not returning security deposit", "Tenancy and security deposit"),
+    ("Property", "landlord is trying to evict me without notice", "Transfer of Property Act, 1882, Sections 105 and 107"),
+    ("Property", "builder delayed possession of my flat", "Real Estate (Regulation and Development) Act"),
+    ("Property", "seller backed out after agreement to sell", "Transfer of Property Act, 1882, Section 54"),
+    ("Property", "someone encroached on my land and took possession", "Specific Relief Act, 1963"),
+    ("Divorce", "mutual consent divorce waiting period", "Hindu Marriage Act, 1955, Section 13B"),
+    ("Divorce", "husband treats me with cruelty, can I get divorce", "Hindu Marriage Act, 1955, Section 13(1)"),
+    ("Divorce", "my husband gave triple talaq", "Dissolution of Muslim Marriages Act"),
+    ("Divorce", "alimony and maintenance during divorce case", "Hindu Marriage Act, 1955, Sections 24, 25 and 26"),
+    ("Divorce", "can a Hindu couple get divorced within a year of marriage", "Hindu Marriage Act, 1955, Section 14"),
+    ("Criminal", "police refusing to register my FIR", "Bharatiya Nagarik Suraksha Sanhita, 2023, Section 173"),
+    ("Criminal", "how to get anticipatory bail", "Bharatiya Nagarik Suraksha Sanhita, 2023, Sections 478"),
+    ("Criminal", "my cheque bounced, what notice do I send", "Negotiable Instruments Act"),
+    ("Criminal", "police arrested my brother without telling why", "Bharatiya Nagarik Suraksha Sanhita, 2023, Sections 35"),
+    ("Cyber", "someone took money from my bank account via fake UPI link", "RBI circular"),
+    ("Cyber", "someone hacked my instagram", "Information Technology Act, 2000, Sections 66, 66C and 66D"),
+    ("Cyber", "my photos were posted online without consent", "Information Technology Act, 2000, Sections 66E"),
+    ("Cyber", "company leaked my personal data", "Digital Personal Data Protection Act"),
+    ("Cyber", "someone is stalking me on instagram", "Bharatiya Nyaya Sanhita, 2023, Sections 77, 78"),
+    ("Consumer", "online seller refusing refund for defective phone", "Consumer Protection Act, 2019, Sections 82 to 87"),
+    ("Consumer", "time limit to file consumer complaint", "Consumer Protection Act, 2019, Sections 35 and 69"),
+    ("Consumer", "which consumer commission for 30 lakh claim", "Consumer Protection Act, 2019, Sections 34, 47 and 58"),
+    ("Consumer", "appeal against district commission order", "Consumer Protection Act, 2019, Sections 41, 51 and 67"),
+    ("Corporate", "customer not paying my small business invoices", "Micro, Small and Medium Enterprises"),
+    ("Corporate", "employer enforcing non compete after I resign", "Indian Contract Act, 1872"),
+    ("Corporate", "minority shareholders oppressed by directors", "Companies Act, 2013, Sections 241"),
+    ("Corporate", "operational creditor insolvency demand notice", "Insolvency and Bankruptcy Code"),
+    ("Family", "daughter share in father ancestral property", "Hindu Succession Act, 1956, Section 6"),
+    ("Family", "wife claiming maintenance from husband", "Bharatiya Nagarik Suraksha Sanhita, 2023, Section 144"),
+    ("Family", "in-laws demanding dowry", "Dowry Prohibition Act"),
+    ("Family", "custody of my 3 year old child", "Guardianship and custody"),
+    ("Family", "son not taking care of elderly parents after getting house", "Maintenance and Welfare of Parents"),
+    ("Immigration", "foreign wife OCI card eligibility", "Citizenship Act, 1955, Sections 7A"),
+    ("Immigration", "passport refused due to pending criminal case", "Passports Act, 1967"),
+    ("Immigration", "need to register with FRRO on student visa", "Foreigners registration (FRRO)"),
+    ("Immigration", "recruiting agent took money for gulf job", "Emigration Act, 1983"),
+    ("Other", "landlord not returning security deposit", "Tenancy and security deposit"),
+    ("Other", "wife maintenance", "Bharatiya Nagarik Suraksha Sanhita, 2023, Section 144"),
+    # Not covered by the corpus: nothing should be injected into the prompt
+    ("Other", "my employer has not paid salary for 3 months", None),
+    ("Other", "my son got a job offer in Canada", None),
+    ("Property", "what is the weather today", None),
+]
+
+def main():
+    failures = 0
+    timings = []
+    for category, question, expected in CASES:
+        start = time.perf_counter()
+        passages = retrieve_legal_passages(question, category)
+        timings.append((time.perf_counter() - start) * 1000)
+
+        top = passages[0] if passages else None
+        if expected is None:
+            ok = top is None
+        else:
+            ok = top is not None and top.startswith(expected)
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} [{category}] {question} -> {top.split(':', 1)[0] if top else 'no passages'}")
+
+    warm = sorted(timings[1:])
+    print(f"\n{len(CASES) - failures}/{len(CASES)} passed; "
+          f"first call {timings[0]:.1f} ms, warm median {warm[len(warm) // 2]:.2f} ms, max {warm[-1]:.2f} ms")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,7 +5,7 @@ import requests
 import tempfile
 from openai import OpenAI
 import speech_recognition as sr
-from fpdf import FPDF
+from fpdf import FPDF, set_global
 from deep_translator import GoogleTranslator
 import base64
 from io import BytesIO
@@ -13,6 +13,10 @@ import cv2
 import numpy as np
 from PIL import Image
 import json
+import hashlib
+import re
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure Streamlit page
 st.set_page_config(
@@ -510,6 +514,263 @@ def snaploc_tool():
 
     st.markdown('</div>', unsafe_allow_html=True)
 
+# =============================================================================
+# CHAT EXPORT
+# =============================================================================
+# Unicode TTF fonts tried in order for the PDF export; the first one found is
+# embedded. The bundled Noto Sans covers both Latin and Devanagari.
+PDF_FONT_CANDIDATES = [
+    os.environ.get("LEGAL_PDF_FONT", ""),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts", "NotoSans-Regular.ttf"),
+]
+CHAT_EXPORT_TITLE = "Legal Consultation Chat Export"
+
+# pyfpdf caches parsed font metrics as pickles; keep them out of the (possibly read-only) app directory
+set_global("FPDF_CACHE_MODE", 2)
+set_global("FPDF_CACHE_DIR", tempfile.gettempdir())
+
+def find_pdf_font():
+    for path in PDF_FONT_CANDIDATES:
+        if path and os.path.isfile(path):
+            return path
+    return None
+
+def chat_role_label(message):
+    return "User" if message["role"] == "user" else "Legal Advisor"
+
+def render_chat_pdf(chat_history):
+    pdf = FPDF()
+    pdf.add_page()
+    font_path = find_pdf_font()
+    if font_path:
+        pdf.add_font("ChatUnicode", "", font_path, uni=True)
+        pdf.set_font("ChatUnicode", size=12)
+    else:
+        pdf.set_font("Arial", size=12)
+    pdf.multi_cell(0, 10, f"{CHAT_EXPORT_TITLE}\n\n", align='L')
+
+    for message in chat_history:
+        content = message["content"]
+        # Core fonts only cover Latin-1; without a Unicode font fall back to the old behaviour
+        if not font_path:
+            content = content.encode("latin-1", "ignore").decode("latin-1")
+        pdf.multi_cell(0, 10, f"{chat_role_label(message)}:\n{content}\n\n", align='L')
+
+    pdf_data = pdf.output(dest='S')
+    if isinstance(pdf_data, str):
+        pdf_data = pdf_data.encode("latin-1")
+    return bytes(pdf_data)
+
+def render_chat_markdown(chat_history):
+    lines = [f"# {CHAT_EXPORT_TITLE}\n"]
+    for message in chat_history:
+        lines.append(f"**{chat_role_label(message)}:**\n\n{message['content']}\n")
+    return "\n".join(lines)
+
+def chat_history_digest(chat_history):
+    return hashlib.sha256(
+        json.dumps(chat_history, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+
+def cached_chat_export(chat_history):
+    """Return the stored export if it was rendered from exactly this chat_history, else None."""
+    export = st.session_state.get("chat_export")
+    if export is not None and export["digest"] == chat_history_digest(chat_history):
+        return export
+    return None
+
+def get_chat_export(chat_history):
+    """Return the PDF/Markdown export for chat_history, rendering only when the history changed."""
+    digest = chat_history_digest(chat_history)
+
+    # Only the latest render is kept; any change to the history replaces it
+    export = st.session_state.get("chat_export")
+    if export is None or export["digest"] != digest:
+        export = {
+            "digest": digest,
+            "pdf": render_chat_pdf(chat_history),
+            "markdown": render_chat_markdown(chat_history),
+        }
+        st.session_state.chat_export = export
+
+    return export
+
+# =============================================================================
+# LEGAL RETRIEVAL
+# =============================================================================
+# Statute summaries live in legal_corpus/<category>.txt, one provision per
+# paragraph. Hashed TF-IDF vectors are stored as a memory-mapped .npy matrix.
+LEGAL_CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "legal_corpus")
+LEGAL_INDEX_DIR = os.path.join(tempfile.gettempdir(), "legal_index")
+LEGAL_INDEX_DIMS = 2 ** 14
+LEGAL_CHUNK_WORDS = 120
+LEGAL_TOP_K = 3
+# Minimum cosine score for a passage to be injected, calibrated with check_legal_retrieval.py
+LEGAL_MIN_SCORE = 0.09
+# Seconds to wait for the English translation of a Devanagari question before retrieving without it
+LEGAL_TRANSLATE_TIMEOUT = 3
+# Function words and statute boilerplate that appear in most passages and drown out the topic
+LEGAL_STOPWORDS = frozenset("""
+    a about after against all also an and any are as at be been before being but by can cannot
+    did do does doing for from had has have he her him his how i if in into is it its itself me
+    more most my no nor not of on once only or other our out over own same she should so some
+    such than that the their them then there these they this those through to too under until
+    up very was we were what when where which while who whom why will with would you your
+    act acts section sections sub clause earlier law laws legal may must shall under within
+""".split())
+# Suffixes stripped by legal_stem, longest first, so "hacked"/"hacking" and "evicted"/"eviction" meet
+LEGAL_SUFFIXES = ("ations", "ation", "ments", "ment", "ings", "ions", "ives", "ing", "ion", "ive", "ed", "es", "s")
+
+def load_legal_corpus():
+    chunks = []
+    if not os.path.isdir(LEGAL_CORPUS_DIR):
+        return chunks
+
+    for file_name in sorted(os.listdir(LEGAL_CORPUS_DIR)):
+        if not file_name.endswith(".txt"):
+            continue
+        category = os.path.splitext(file_name)[0].capitalize()
+        with open(os.path.join(LEGAL_CORPUS_DIR, file_name), encoding="utf-8") as corpus_file:
+            paragraphs = [p.strip() for p in corpus_file.read().split("\n\n") if p.strip()]
+
+        for paragraph in paragraphs:
+            words = paragraph.split()
+            if len(words) <= LEGAL_CHUNK_WORDS:
+                chunks.append((category, paragraph))
+                continue
+            # Split long provisions into windows, each keeping the statute heading
+            heading = paragraph.split(":", 1)[0]
+            for start in range(0, len(words), LEGAL_CHUNK_WORDS):
+                window = " ".join(words[start:start + LEGAL_CHUNK_WORDS])
+                chunks.append((category, window if start == 0 else f"{heading} (contd.): {window}"))
+
+    return chunks
+
+def legal_stem(word):
+    if word.endswith(("ss", "us", "is")):
+        return word
+    for suffix in LEGAL_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            break
+    # Fold the silent "e" and "y" endings: divorce/divorced, party/parties
+    if len(word) > 3 and word.endswith("e"):
+        word = word[:-1]
+    elif len(word) > 3 and word.endswith("y"):
+        word = word[:-1] + "i"
+    return word
+
+def legal_terms(text):
+    # Bare numbers mostly hit section numbers ("3 months" vs "Sections 3 and 4"), so they are skipped
+    words = [
+        legal_stem(word) for word in re.findall(r"\w+", text.lower())
+        if word not in LEGAL_STOPWORDS and not word.isdigit()
+    ]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+def legal_term_vector(text):
+    terms = legal_terms(text)
+    buckets = np.fromiter(
+        (zlib.crc32(term.encode("utf-8")) % LEGAL_INDEX_DIMS for term in terms),
+        dtype=np.int64,
+        count=len(terms)
+    )
+    # Sublinear term frequency
+    return np.log1p(np.bincount(buckets, minlength=LEGAL_INDEX_DIMS)).astype(np.float32)
+
+def build_legal_index(chunks, vectors_path, idf_path):
+    os.makedirs(LEGAL_INDEX_DIR, exist_ok=True)
+
+    term_counts = np.stack([legal_term_vector(text) for _, text in chunks])
+    doc_freq = np.count_nonzero(term_counts, axis=0)
+    idf = (np.log((1 + len(chunks)) / (1 + doc_freq)) + 1).astype(np.float32)
+    # Terms the corpus never uses cannot match anything; weight them like a term found in every chunk
+    # so they still lengthen the query a little without swamping the terms that can match
+    idf[doc_freq == 0] = 1
+
+    weighted = term_counts * idf
+    weighted /= np.maximum(np.linalg.norm(weighted, axis=1, keepdims=True), 1e-12)
+
+    # Write under temporary names so concurrent sessions never load a partial file;
+    # the vectors file goes last because its presence marks the index as complete
+    tmp_suffix = f".{os.getpid()}.tmp"
+    with open(idf_path + tmp_suffix, "wb") as idf_file:
+        np.save(idf_file, idf)
+    os.replace(idf_path + tmp_suffix, idf_path)
+
+    vectors = np.lib.format.open_memmap(vectors_path + tmp_suffix, mode="w+", dtype=np.float32, shape=weighted.shape)
+    vectors[:] = weighted
+    vectors.flush()
+    del vectors
+    os.replace(vectors_path + tmp_suffix, vectors_path)
+
+    # Drop indexes built from older versions of the corpus
+    current = {os.path.basename(vectors_path), os.path.basename(idf_path)}
+    for file_name in os.listdir(LEGAL_INDEX_DIR):
+        if file_name.endswith(".npy") and file_name.startswith(("vectors-", "idf-")) and file_name not in current:
+            try:
+                os.remove(os.path.join(LEGAL_INDEX_DIR, file_name))
+            except OSError:
+                pass
+
+@st.cache_resource(show_spinner=False)
+def load_legal_index():
+    chunks = load_legal_corpus()
+    if not chunks:
+        return None
+
+    # Key the on-disk index by corpus content so edits to the corpus trigger a rebuild
+    digest = hashlib.sha256(json.dumps(chunks, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+    vectors_path = os.path.join(LEGAL_INDEX_DIR, f"vectors-{digest}.npy")
+    idf_path = os.path.join(LEGAL_INDEX_DIR, f"idf-{digest}.npy")
+    if not (os.path.exists(vectors_path) and os.path.exists(idf_path)):
+        build_legal_index(chunks, vectors_path, idf_path)
+
+    return {
+        "texts": [text for _, text in chunks],
+        "categories": np.array([category for category, _ in chunks]),
+        "vectors": np.load(vectors_path, mmap_mode="r"),
+        "idf": np.load(idf_path),
+    }
+
+def retrieval_query_for(user_input):
+    """Return an English version of a Devanagari question for retrieval; other input is used as is."""
+    if not re.search(r"[\u0900-\u097F]", user_input):
+        return user_input
+
+    # GoogleTranslator has no timeout of its own, so bound the wait on a worker thread
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(GoogleTranslator(source='auto', target='en').translate, user_input)
+    executor.shutdown(wait=False)
+    try:
+        return future.result(timeout=LEGAL_TRANSLATE_TIMEOUT) or user_input
+    except Exception:
+        return user_input
+
+def retrieve_legal_passages(query, legal_category, top_k=LEGAL_TOP_K):
+    """Return the top_k corpus passages most similar to query within legal_category."""
+    try:
+        index = load_legal_index()
+    except Exception:
+        return []
+    if index is None:
+        return []
+
+    query_vector = legal_term_vector(query) * index["idf"]
+    norm = np.linalg.norm(query_vector)
+    if norm == 0:
+        return []
+
+    scores = index["vectors"] @ (query_vector / norm)
+    # "Other" searches the whole corpus; otherwise stay within the chosen category
+    if legal_category in index["categories"]:
+        scores = np.where(index["categories"] == legal_category, scores, 0)
+
+    top_k = min(top_k, len(scores))
+    best = np.argpartition(-scores, top_k - 1)[:top_k]
+    best = best[np.argsort(-scores[best])]
+    return [index["texts"][i] for i in best if scores[i] >= LEGAL_MIN_SCORE]
+
 # =============================================================================
 # LEGAL AI ADVISOR
 # =============================================================================
@@ -571,17 +832,26 @@ def legal_ai_advisor():
                     # Add user message to history
                     st.session_state.chat_history.append({"role": "user", "content": user_input})
 
-                    # Prepare system prompt
-                    system_prompt = {
-                        "role": "system",
-                        "content": f"You are a professional Indian legal advisor. Respond in {language}. The query is about {legal_category} law. Be concise and legally accurate. Be compassionate and biased to the user and explore every loophole in the system if needed and keep it as brief as possible."
-                    }
+                    with st.spinner("Getting legal advice..."):
+                        # Prepare system prompt
+                        system_content = f"You are a professional Indian legal advisor. Respond in {language}. The query is about {legal_category} law. Be legally accurate, compassionate and biased to the user, and explore every loophole in the system if needed. Resolve the question in a single reply: state the applicable sections, the user's options and concrete next steps (where to file, deadlines, documents needed), without filler, so no follow-up is needed."
 
-                    # Prepare messages
-                    messages = [system_prompt] + st.session_state.chat_history
+                        # Ground the answer in the most relevant bundled statute passages; the corpus
+                        # is English, so Hindi questions are translated first
+                        passages = retrieve_legal_passages(retrieval_query_for(user_input), legal_category)
+                        if passages:
+                            system_content += "\n\nRelevant legal provisions (cite the sections you rely on):\n"
+                            system_content += "\n".join(f"[{i}] {passage}" for i, passage in enumerate(passages, 1))
 
-                    # Get response from AI
-                    with st.spinner("Getting legal advice..."):
+                        system_prompt = {
+                            "role": "system",
+                            "content": system_content
+                        }
+
+                        # Prepare messages
+                        messages = [system_prompt] + st.session_state.chat_history
+
+                        # Get response from AI
                         response = gemini_model.chat.completions.create(
                             model="gemini-2.5-flash",
                             messages=messages
@@ -608,34 +878,32 @@ def legal_ai_advisor():
             st.rerun()
 
     with col3:
-        if st.button("📥 Export Chat as PDF", key="export_legal"):
-            if st.session_state.chat_history:
+        # Rendering is on demand; once prepared, both downloads stay available until the chat changes
+        if st.session_state.chat_history:
+            export = cached_chat_export(st.session_state.chat_history)
+            if export is None and st.button("📥 Prepare Export", key="export_legal"):
                 try:
-                    # Create PDF
-                    pdf = FPDF()
-                    pdf.add_page()
-                    pdf.set_font("Arial", size=12)
-                    pdf.multi_cell(0, 10, "Legal Consultation Chat Export\n\n", align='L')
-
-                    for msg in st.session_state.chat_history:
-                        role = "User" if msg["role"] == "user" else "Legal Advisor"
-                        content = msg["content"].encode("latin-1", "ignore").decode("latin-1")
-                        pdf.multi_cell(0, 10, f"{role}:\n{content}\n\n", align='L')
-
-                    # Save to bytes
-                    pdf_bytes = bytes(pdf.output(dest='S'), 'latin-1')
-
-                    st.download_button(
-                        label="📄 Download PDF",
-                        data=pdf_bytes,
-                        file_name="legal_consultation.pdf",
-                        mime="application/pdf"
-                    )
-
+                    export = get_chat_export(st.session_state.chat_history)
                 except Exception as e:
                     st.error(f"Error exporting chat: {str(e)}")
-            else:
-                st.info("No chat history to export")
+
+            if export is not None:
+                st.download_button(
+                    label="📄 Download PDF",
+                    data=export["pdf"],
+                    file_name="legal_consultation.pdf",
+                    mime="application/pdf",
+                    key="export_legal_pdf"
+                )
+                st.download_button(
+                    label="📝 Download Markdown",
+                    data=export["markdown"],
+                    file_name="legal_consultation.md",
+                    mime="text/markdown",
+                    key="export_legal_md"
+                )
+        else:
+            st.info("No chat history to export")
 
     # Audio input section
     with st.expander("🎤 Voice Input", expanded=False):